@@ -1,27 +1,68 @@
-"""Scraper de búsqueda de corporaciones Sunbiz usando Camoufox."""
+"""Scraper de búsqueda de corporaciones Sunbiz (httpx + selectolax, Camoufox si hay bloqueo)."""
 
-import json
+import asyncio
+import functools
+import mmap
 import re
+import time
+from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterator
 from urllib.parse import quote
 
-from camoufox.sync_api import Camoufox  # type: ignore[import-untyped]
+import httpx
+import orjson
+from camoufox.async_api import AsyncCamoufox  # type: ignore[import-untyped]
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from pybloom_live import ScalableBloomFilter  # type: ignore[import-untyped]
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 BASE_URL = "https://search.sunbiz.org"
 SEARCH_TERM = "PLUMBER"  # Intercambiable: "WATER", "PLUMBER", etc.
 OUTPUT_JSON = "sunbiz_data.json"
+DETAIL_CONCURRENCY = 8  # Páginas de detalle abiertas a la vez
+PAGE_TIMEOUT = 6  # Segundos por intento de carga de una página
+PAGE_ATTEMPTS = 2  # Intentos por página antes de darla por perdida
+RETRY_BACKOFF = 1.0  # Espera antes del primer reintento; se duplica en cada uno
+BLOCK_COOLDOWN = 600  # Segundos usando Camoufox tras un bloqueo antes de volver a probar HTTP
+MAX_CONSECUTIVE_FAILURES = 5  # Detalles fallidos seguidos tras los que se deja de paginar
+SEEN_BLOOM_CAPACITY = 100_000  # Tamaño inicial del filtro de direcciones vistas (crece solo)
+SEEN_BLOOM_ERROR_RATE = 1e-6  # Probabilidad de descartar por error una dirección nueva
+
+# Cabeceras de un Firefox normal para las peticiones HTTP directas
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:135.0) Gecko/20100101 Firefox/135.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+# Elementos que indican que una página de resultados o de detalle ya tiene los datos
+READY_SELECTOR = "#search-results table tbody tr, div.detailSection"
+# Textos que solo aparecen en la página de desafío de Cloudflare (no en páginas normales)
+BLOCK_MARKERS = ("<title>Just a moment...</title>",)
 
 # Patrón para detectar PO Box en todas sus presentaciones
 PO_BOX_PATTERN = re.compile(
     r"\b(?:p\.?\s*o\.?\s*box|post\s*office\s*box|p\.?o\.?\.?box)\b",
     re.IGNORECASE,
 )
+_WHITESPACE_RE = re.compile(r"\s+")
 
+# Etiquetas que inner_text separa en líneas propias / que no aportan texto visible
+_BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+    "li", "main", "nav", "ol", "p", "pre", "section", "table", "tbody", "tfoot",
+    "thead", "tr", "ul",
+})
+_SKIP_TAGS = frozenset({"-comment", "script", "style", "noscript", "template"})
 
+
+@functools.lru_cache(maxsize=512)
 def build_search_url(term: str = SEARCH_TERM) -> str:
-    """Construye la URL de búsqueda Sunbiz con el término indicado."""
-    encoded = quote(term, safe="")
+    """Construye la URL de búsqueda Sunbiz con el término indicado (cacheada por término)."""
+    # Letras y dígitos ASCII no cambian al codificar
+    encoded = term if term.isascii() and term.isalnum() else quote(term, safe="")
     return (
         f"{BASE_URL}/Inquiry/CorporationSearch/SearchResults"
         f"?InquiryType=EntityName&inquiryDirectionType=ForwardList"
@@ -37,72 +78,371 @@ def _is_po_box_or_empty(text: str) -> bool:
     """True si el texto está vacío o es una dirección tipo PO Box."""
     if not text or not text.strip():
         return True
+    # Toda variante de PO Box contiene "box": sin él no hace falta la regex
+    if "box" not in text.lower():
+        return False
     return bool(PO_BOX_PATTERN.search(text))
 
 
 def _normalize_address(addr: str) -> str:
     """Una sola línea, espacios normalizados, para comparar o guardar en seen."""
-    return " ".join(addr.replace("\n", " ").split()).strip()
+    return _WHITESPACE_RE.sub(" ", addr).strip()
 
 
 def _has_valid_address(details: dict[str, str]) -> bool:
     """True si hay al menos un valor que parezca dirección física (no vacía, no PO Box)."""
-    for key, value in details.items():
-        if "address" in key.lower() and value:
-            if not _is_po_box_or_empty(value):
-                return True
-    return False
+    return any(
+        not _is_po_box_or_empty(value)
+        for key, value in details.items()
+        if value and "address" in key.lower()
+    )
+
+
+def _seen_bloom_path(seen_path: Path) -> Path:
+    """Ruta del filtro Bloom persistido junto al historial (ej. plumber_seen.txt.bloom)."""
+    return seen_path.with_name(seen_path.name + ".bloom")
+
 
+def _iter_seen_lines(seen_path: Path) -> Iterator[str]:
+    """Recorre las direcciones del historial vía mmap, sin cargar el archivo entero como str."""
+    if not seen_path.stat().st_size:  # mmap no admite archivos vacíos
+        return
+    with seen_path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter(mm.readline, b""):
+            line = line.strip()
+            if line:
+                yield line.decode("utf-8")
 
-def _get_next_list_url(page) -> str | None:
+
+def _load_seen(seen_path: Path | None) -> tuple[ScalableBloomFilter, bool]:
+    """
+    Carga las direcciones ya vistas en un filtro Bloom.
+
+    Usa el .bloom guardado si es más reciente que el historial; si no (primera vez o
+    historial editado a mano), lo reconstruye leyendo el historial línea a línea.
+    Devuelve (filtro, reconstruido): si se reconstruyó, hay que volver a guardar el .bloom.
+    """
+    if seen_path is not None and seen_path.exists():
+        bloom_path = _seen_bloom_path(seen_path)
+        if bloom_path.exists() and bloom_path.stat().st_mtime_ns >= seen_path.stat().st_mtime_ns:
+            with bloom_path.open("rb") as f:
+                return ScalableBloomFilter.fromfile(f), False
+    seen = ScalableBloomFilter(initial_capacity=SEEN_BLOOM_CAPACITY, error_rate=SEEN_BLOOM_ERROR_RATE)
+    if seen_path is None or not seen_path.exists():
+        return seen, False
+    for addr in _iter_seen_lines(seen_path):
+        seen.add(addr)
+    return seen, True
+
+
+def _save_seen(seen_path: Path, seen: ScalableBloomFilter, new_seen: list[str], rebuilt: bool = False) -> None:
+    """
+    Añade al historial las direcciones nuevas de esta ejecución y guarda el filtro Bloom.
+
+    El .bloom se guarda si hubo direcciones nuevas o si _load_seen lo reconstruyó.
+    """
+    if new_seen:
+        # Historiales antiguos se escribían sin salto de línea final
+        needs_newline = False
+        if seen_path.exists() and seen_path.stat().st_size:
+            with seen_path.open("rb") as f:
+                f.seek(-1, 2)
+                needs_newline = f.read(1) != b"\n"
+        with seen_path.open("a", encoding="utf-8") as f:
+            f.write(("\n" if needs_newline else "") + "\n".join(new_seen) + "\n")
+    if new_seen or rebuilt:
+        with _seen_bloom_path(seen_path).open("wb") as f:
+            seen.tofile(f)
+
+
+def _write_outputs(
+    path: Path,
+    term_used: str,
+    results: list[dict],
+    seen_path: Path | None,
+    seen: ScalableBloomFilter,
+    new_seen: list[str],
+    seen_rebuilt: bool,
+) -> None:
+    """Escribe el JSON, el TXT de direcciones y el historial de vistas al terminar una búsqueda."""
+    path.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    txt_path = path.parent / f"{term_used}{len(results)}.txt"
+    # new_seen tiene, en orden, la Principal Address ya normalizada de cada resultado
+    txt_path.write_bytes("".join(addr + "\n" for addr in new_seen).encode("utf-8"))
+    if seen_path:
+        _save_seen(seen_path, seen, new_seen, rebuilt=seen_rebuilt)
+
+
+def compact_seen(seen_path: Path | str) -> int:
+    """
+    Reescribe el historial ordenado y sin líneas repetidas, y regenera su filtro Bloom.
+
+    Las búsquedas solo añaden al final del historial; ordenar es opcional y se hace
+    únicamente cuando se llama a esta función. Devuelve cuántas direcciones quedan.
+    """
+    seen_path = Path(seen_path)
+    if not seen_path.exists():
+        return 0
+    addresses = sorted(set(_iter_seen_lines(seen_path)))
+    seen_path.write_text("".join(addr + "\n" for addr in addresses), encoding="utf-8")
+    seen = ScalableBloomFilter(initial_capacity=SEEN_BLOOM_CAPACITY, error_rate=SEEN_BLOOM_ERROR_RATE)
+    for addr in addresses:
+        seen.add(addr)
+    with _seen_bloom_path(seen_path).open("wb") as f:
+        seen.tofile(f)
+    return len(addresses)
+
+
+async def _get_next_list_url(page) -> str | None:
     """Devuelve la URL del enlace 'Next List' o None si no existe."""
-    link = page.locator('a[title="Next List"]').first
-    if link.count() == 0:
+    href = await page.eval_on_selector_all(
+        'a[title="Next List"]',
+        "links => links.length ? links[0].getAttribute('href') : null",
+    )
+    if not href:
         return None
-    href = link.get_attribute("href")
+    return BASE_URL + href if href.startswith("/") else href
+
+
+async def _extract_detail_sections(page) -> dict[str, str]:
+    """Extrae todas las secciones .detailSection de la página de detalle (una sola llamada al navegador)."""
+    pairs = await page.eval_on_selector_all(
+        "div.detailSection",
+        """sections => sections.map(section => {
+            const spans = section.querySelectorAll('span');
+            if (spans.length < 2) return null;
+            const label = spans[0].innerText.trim();
+            return label ? [label, spans[1].innerText.trim()] : null;
+        }).filter(Boolean)""",
+    )
+    return dict(pairs)
+
+
+async def _extract_search_results(page) -> list[dict]:
+    """Extrae filas de la tabla de resultados (nombre, documento, estado, href) en una sola llamada."""
+    return await page.eval_on_selector_all(
+        "#search-results table tbody tr",
+        """rows => rows.map(tr => {
+            const cells = tr.querySelectorAll('td');
+            if (cells.length < 3) return null;
+            const link = cells[0].querySelector('a');
+            if (!link) return null;
+            return {
+                corporate_name: link.innerText.trim(),
+                document_number: cells[1].innerText.trim(),
+                status: cells[2].innerText.trim(),
+                detail_path: link.getAttribute('href') || '',
+            };
+        }).filter(Boolean)""",
+    )
+
+
+async def _extract_search_page(page) -> tuple[list[dict], str | None]:
+    """Filas de resultados y URL de 'Next List' de la página de lista abierta."""
+    return await _extract_search_results(page), await _get_next_list_url(page)
+
+
+def _collect_text(node: LexborNode, parts: list[str]) -> None:
+    """Añade a parts el texto de los hijos de node, con "\n" en <br> y alrededor de bloques."""
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            parts.append(_WHITESPACE_RE.sub(" ", child.text_content or ""))
+        elif tag == "br":
+            parts.append("\n")
+        elif tag in _BLOCK_TAGS:
+            parts.append("\n")
+            _collect_text(child, parts)
+            parts.append("\n")
+        elif tag in ("td", "th"):
+            parts.append(" ")
+            _collect_text(child, parts)
+            parts.append(" ")
+        elif tag not in _SKIP_TAGS:
+            _collect_text(child, parts)
+
+
+def _node_text(node: LexborNode) -> str:
+    """
+    Texto visible del nodo como lo da inner_text en el navegador: salto de línea en <br>
+    y entre bloques, texto en línea unido con espacios y espacios repetidos colapsados.
+    """
+    parts: list[str] = []
+    _collect_text(node, parts)
+    lines = (line.strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _parse_next_list_url(tree: LexborHTMLParser) -> str | None:
+    """Como _get_next_list_url, sobre el HTML ya analizado."""
+    link = tree.css_first('a[title="Next List"]')
+    href = link.attributes.get("href") if link is not None else None
     if not href:
         return None
     return BASE_URL + href if href.startswith("/") else href
 
 
-def _extract_detail_sections(page) -> dict[str, str]:
-    """Extrae todas las secciones .detailSection de la página de detalle."""
+def _parse_detail_sections(tree: LexborHTMLParser) -> dict[str, str]:
+    """Como _extract_detail_sections, sobre el HTML ya analizado."""
     sections = {}
-    for section in page.locator("div.detailSection").all():
-        spans = section.locator("span").all()
+    for section in tree.css("div.detailSection"):
+        spans = section.css("span")
         if len(spans) < 2:
             continue
-        label = spans[0].inner_text().strip()
-        value = spans[1].inner_text().strip()
+        label = _node_text(spans[0])
         if label:
-            sections[label] = value
+            sections[label] = _node_text(spans[1])
     return sections
 
 
-def _extract_search_results(page) -> list[dict]:
-    """Extrae filas de la tabla de resultados (nombre, documento, estado, href)."""
+def _parse_search_results(tree: LexborHTMLParser) -> list[dict]:
+    """Como _extract_search_results, sobre el HTML ya analizado."""
     rows = []
-    for tr in page.locator("#search-results table tbody tr").all():
-        cells = tr.locator("td").all()
+    for tr in tree.css("#search-results table tbody tr"):
+        cells = tr.css("td")
         if len(cells) < 3:
             continue
-        link = cells[0].locator("a").first
-        if not link.count():
+        link = cells[0].css_first("a")
+        if link is None:
             continue
-        corporate_name = link.inner_text().strip()
-        href = link.get_attribute("href") or ""
-        document_number = cells[1].inner_text().strip()
-        status = cells[2].inner_text().strip()
         rows.append({
-            "corporate_name": corporate_name,
-            "document_number": document_number,
-            "status": status,
-            "detail_path": href,
+            "corporate_name": _node_text(link),
+            "document_number": _node_text(cells[1]),
+            "status": _node_text(cells[2]),
+            "detail_path": link.attributes.get("href") or "",
         })
     return rows
 
 
-def fetch_sunbiz_data(
+def _is_blocked(response: httpx.Response) -> bool:
+    """True si la respuesta es un rechazo o un desafío anti-bots en vez de la página pedida."""
+    if response.status_code in (403, 503):
+        return True
+    if response.headers.get("cf-mitigated") == "challenge":
+        return True
+    return any(marker in response.text for marker in BLOCK_MARKERS)
+
+
+class PageLoadError(Exception):
+    """Una página de Sunbiz no cargó tras PAGE_ATTEMPTS intentos."""
+
+
+async def _safe_goto(page, url: str) -> None:
+    """
+    Navega a url con PAGE_TIMEOUT por intento y reintentos con espera exponencial.
+
+    Lanza PageLoadError si ningún intento carga. Si la página carga pero no aparece
+    READY_SELECTOR (lista vacía), no es un fallo: los extractores devolverán vacío.
+    """
+    for attempt in range(PAGE_ATTEMPTS):
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
+            break
+        except PlaywrightError as e:
+            if attempt == PAGE_ATTEMPTS - 1:
+                raise PageLoadError(url) from e
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+    try:
+        await page.locator(READY_SELECTOR).first.wait_for(timeout=PAGE_TIMEOUT * 1000)
+    except PlaywrightTimeoutError:
+        pass
+
+
+class SunbizPages:
+    """
+    Descarga páginas de Sunbiz con httpx y las analiza con selectolax.
+
+    Si Sunbiz bloquea las peticiones HTTP, abre Camoufox (una sola vez) y usa el navegador
+    durante BLOCK_COOLDOWN segundos antes de volver a probar HTTP. Una misma instancia
+    puede usarse en varias búsquedas seguidas para reutilizar las conexiones HTTP y el
+    navegador ya abierto.
+    """
+
+    def __init__(self, headless: bool = True) -> None:
+        self._headless = headless
+        self._stack = AsyncExitStack()
+        self._client: httpx.AsyncClient | None = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+        self._blocked_until = 0.0  # time.monotonic() hasta el que se usa solo el navegador
+
+    async def __aenter__(self) -> "SunbizPages":
+        self._client = await self._stack.enter_async_context(
+            httpx.AsyncClient(
+                http2=True,
+                headers=HTTP_HEADERS,
+                limits=httpx.Limits(max_connections=16),
+                timeout=PAGE_TIMEOUT,
+                follow_redirects=True,
+            )
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._stack.aclose()
+
+    async def _get_html(self, url: str) -> str | None:
+        """
+        HTML de url por HTTP, o None si Sunbiz nos bloquea (entonces se usa el navegador).
+
+        Lanza PageLoadError si la página no se obtiene: error de red o respuesta no 2xx
+        (429 y 5xx se reintentan con espera exponencial antes).
+        """
+        if time.monotonic() < self._blocked_until:
+            return None
+        for attempt in range(PAGE_ATTEMPTS):
+            try:
+                response = await self._client.get(url)
+            except httpx.TransportError as e:  # Incluye timeouts
+                error: Exception = e
+            else:
+                if _is_blocked(response):
+                    self._blocked_until = time.monotonic() + BLOCK_COOLDOWN
+                    return None
+                if response.is_success:
+                    return response.text
+                error = httpx.HTTPStatusError(
+                    f"HTTP {response.status_code}", request=response.request, response=response
+                )
+                # 404 y similares no cambian al reintentar; 429 y 5xx sí pueden
+                if not (response.is_server_error or response.status_code == 429):
+                    break
+            if attempt < PAGE_ATTEMPTS - 1:
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        raise PageLoadError(url) from error
+
+    async def _with_browser_page(self, url: str, extract):
+        """Abre url en una pestaña de Camoufox, aplica extract(page) y cierra la pestaña."""
+        async with self._browser_lock:
+            if self._browser is None:
+                self._browser = await self._stack.enter_async_context(AsyncCamoufox(headless=self._headless))
+        page = await self._browser.new_page()
+        try:
+            await _safe_goto(page, url)
+            return await extract(page)
+        finally:
+            await page.close()
+
+    async def search_page(self, url: str) -> tuple[list[dict], str | None]:
+        """Filas de resultados y URL de 'Next List', de una sola descarga. Lanza PageLoadError."""
+        html = await self._get_html(url)
+        if html is None:
+            return await self._with_browser_page(url, _extract_search_page)
+        tree = LexborHTMLParser(html)
+        return _parse_search_results(tree), _parse_next_list_url(tree)
+
+    async def detail_sections(self, url: str) -> dict[str, str] | None:
+        """Secciones de la página de detalle, o None si no cargó tras los reintentos."""
+        try:
+            html = await self._get_html(url)
+            if html is None:
+                return await self._with_browser_page(url, _extract_detail_sections)
+            return _parse_detail_sections(LexborHTMLParser(html))
+        except PageLoadError:
+            return None
+
+
+async def fetch_sunbiz_data_async(
     search_url: str | None = None,
     search_term: str | None = None,
     max_results: int | None = None,
@@ -110,6 +450,7 @@ def fetch_sunbiz_data(
     headless: bool = True,
     on_progress: Callable[[int], None] | None = None,
     seen_path: Path | str | None = None,
+    pages: SunbizPages | None = None,
 ) -> list[dict]:
     """
     Obtiene datos de Sunbiz: resultados de búsqueda y detalle de cada entidad.
@@ -118,77 +459,114 @@ def fetch_sunbiz_data(
     - max_results: número máximo de entidades a extraer (solo con dirección válida); None = todas.
     - on_progress: callback opcional llamado con la cantidad actual de resultados extraídos.
     - seen_path: archivo con direcciones ya guardadas (una por línea); evita repetir en futuras búsquedas del mismo término.
+    - pages: sesión SunbizPages ya abierta para reutilizarla (no se cierra al terminar); si no, se abre una propia.
+
+    Las páginas se descargan por HTTP (Camoufox solo si Sunbiz bloquea) y las de detalle
+    en lotes de DETAIL_CONCURRENCY peticiones en paralelo.
     """
     if search_url is None:
         search_url = build_search_url(search_term or SEARCH_TERM)
     results: list[dict] = []
 
-    seen: set[str] = set()
-    if seen_path:
-        p = Path(seen_path)
-        if p.exists():
-            seen = {line.strip() for line in p.read_text(encoding="utf-8").splitlines() if line.strip()}
+    seen_path = Path(seen_path) if seen_path else None
+    # La E/S de disco va en un hilo: la función puede correr en el event loop del bot
+    seen, seen_rebuilt = await asyncio.to_thread(_load_seen, seen_path)
+    new_seen: list[str] = []  # Añadidas en esta ejecución (el filtro no se puede recorrer)
+    fetched_paths: set[str] = set()
 
-    with Camoufox(headless=headless) as browser:
-        page = browser.new_page()
+    async with AsyncExitStack() as stack:
+        if pages is None:
+            pages = await stack.enter_async_context(SunbizPages(headless=headless))
         current_url: str | None = search_url
+        consecutive_failures = 0
 
         while current_url:
-            page.goto(current_url, wait_until="domcontentloaded")
-            page.wait_for_load_state("networkidle", timeout=15000)
-
-            rows = _extract_search_results(page)
+            try:
+                rows, next_url = await pages.search_page(current_url)
+            except PageLoadError:
+                break  # Sin la lista no hay más páginas que recorrer; se guarda lo obtenido
+            # Sunbiz repite entidades entre listas: no volver a pedir el mismo detalle
+            new_rows = []
             for row in rows:
+                if row["detail_path"] in fetched_paths:
+                    continue
+                fetched_paths.add(row["detail_path"])
+                new_rows.append(row)
+            rows = new_rows
+            for start in range(0, len(rows), DETAIL_CONCURRENCY):
                 if max_results is not None and len(results) >= max_results:
                     break
-                detail_path = row.pop("detail_path")
-                detail_url = BASE_URL + detail_path if detail_path.startswith("/") else detail_path
-
-                page.goto(detail_url, wait_until="domcontentloaded")
-                page.wait_for_load_state("networkidle", timeout=15000)
-
-                details = _extract_detail_sections(page)
-                if not _has_valid_address(details):
-                    continue
-                addr = details.get("Principal Address", "").strip()
-                if not addr:
-                    continue
-                normalized = _normalize_address(addr)
-                if normalized in seen:
-                    continue
-                seen.add(normalized)
-                results.append({
-                    "corporate_name": row["corporate_name"],
-                    "document_number": row["document_number"],
-                    "status": row["status"],
-                    "detail_url": detail_url,
-                    "details": details,
-                })
-                if on_progress:
-                    on_progress(len(results))
+                if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                    break
+                batch = rows[start:start + DETAIL_CONCURRENCY]
+                detail_urls = []
+                for row in batch:
+                    detail_path = row.pop("detail_path")
+                    detail_urls.append(BASE_URL + detail_path if detail_path.startswith("/") else detail_path)
+                batch_details = await asyncio.gather(*(pages.detail_sections(url) for url in detail_urls))
+
+                # Filtrado y deduplicación en orden, en la tarea principal
+                for row, detail_url, details in zip(batch, detail_urls, batch_details):
+                    if max_results is not None and len(results) >= max_results:
+                        break
+                    if details is None:
+                        consecutive_failures += 1
+                        continue
+                    consecutive_failures = 0
+                    if not _has_valid_address(details):
+                        continue
+                    addr = details.get("Principal Address", "").strip()
+                    if not addr:
+                        continue
+                    normalized = _normalize_address(addr)
+                    if normalized in seen:
+                        continue
+                    seen.add(normalized)
+                    new_seen.append(normalized)
+                    results.append({
+                        "corporate_name": row["corporate_name"],
+                        "document_number": row["document_number"],
+                        "status": row["status"],
+                        "detail_url": detail_url,
+                        "details": details,
+                    })
+                    if on_progress:
+                        on_progress(len(results))
 
             if max_results is not None and len(results) >= max_results:
                 break
-            page.goto(current_url, wait_until="domcontentloaded")
-            page.wait_for_load_state("networkidle", timeout=15000)
-            current_url = _get_next_list_url(page)
-
-    path = Path(output_path)
-    path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                break  # Sunbiz no responde: se guarda lo obtenido en vez de seguir esperando
+            current_url = next_url
 
     term_used = (search_term or SEARCH_TERM).lower().replace(" ", "")
-    txt_name = f"{term_used}{len(results)}.txt"
-    txt_path = path.parent / txt_name
-    with txt_path.open("w", encoding="utf-8") as f:
-        for item in results:
-            addr = item.get("details", {}).get("Principal Address", "").strip()
-            if addr:
-                f.write(addr.replace("\n", " ") + "\n")
+    await asyncio.to_thread(
+        _write_outputs, Path(output_path), term_used, results, seen_path, seen, new_seen, seen_rebuilt
+    )
+    return results
 
-    if seen_path and seen:
-        Path(seen_path).write_text("\n".join(sorted(seen)), encoding="utf-8")
 
-    return results
+def fetch_sunbiz_data(
+    search_url: str | None = None,
+    search_term: str | None = None,
+    max_results: int | None = None,
+    output_path: str | Path = OUTPUT_JSON,
+    headless: bool = True,
+    on_progress: Callable[[int], None] | None = None,
+    seen_path: Path | str | None = None,
+) -> list[dict]:
+    """Versión síncrona de fetch_sunbiz_data_async (mismos parámetros), para la CLI y código no async."""
+    return asyncio.run(
+        fetch_sunbiz_data_async(
+            search_url=search_url,
+            search_term=search_term,
+            max_results=max_results,
+            output_path=output_path,
+            headless=headless,
+            on_progress=on_progress,
+            seen_path=seen_path,
+        )
+    )
 
 
 if __name__ == "__main__":
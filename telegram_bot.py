@@ -2,95 +2,129 @@
 
 import asyncio
 import configparser
+import contextlib
+import functools
 from pathlib import Path
 
+import aiofiles
+import aiofiles.os
 from telegram import Update
 from telegram.ext import Application, ContextTypes, MessageHandler, filters
 
-from main import fetch_sunbiz_data
+from main import SunbizPages, fetch_sunbiz_data_async
 
 CONFIG_PATH = Path(__file__).resolve().parent / "config.ini"
 
 request_queue: asyncio.Queue[tuple[int, str, int]] = asyncio.Queue()
-queue_lock = asyncio.Lock()
-queue_size = 0
+# Un lock por palabra: dos peticiones del mismo término comparten historial y archivos
+term_locks: dict[str, asyncio.Lock] = {}
 
 
-def load_config() -> configparser.ConfigParser:
-    if not CONFIG_PATH.exists():
-        raise FileNotFoundError(f"No existe {CONFIG_PATH}. Copia config.ini.example a config.ini y configura el token.")
+def _config_mtime_ns() -> int:
+    try:
+        return CONFIG_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"No existe {CONFIG_PATH}. Copia config.ini.example a config.ini y configura el token."
+        ) from None
+
+
+@functools.lru_cache(maxsize=1)
+def _read_config(mtime_ns: int) -> configparser.ConfigParser:
     cfg = configparser.ConfigParser()
     cfg.read(CONFIG_PATH, encoding="utf-8")
     return cfg
 
 
-def get_config() -> tuple[str, int, Path]:
-    cfg = load_config()
+def load_config() -> configparser.ConfigParser:
+    """
+    config.ini parseado. Se cachea por mtime: solo se vuelve a leer si el archivo cambió.
+
+    La caché es por proceso (un solo bot); el objeto devuelto es compartido, no modificarlo.
+    """
+    return _read_config(_config_mtime_ns())
+
+
+def get_config() -> tuple[str, int, Path, int]:
+    """(token, max_addresses, data_dir, workers), cacheado igual que load_config."""
+    return _config_values(_config_mtime_ns())
+
+
+@functools.lru_cache(maxsize=1)
+def _config_values(mtime_ns: int) -> tuple[str, int, Path, int]:
+    cfg = _read_config(mtime_ns)
     token = cfg.get("telegram", "token", fallback="").strip()
     if not token or token == "YOUR_BOT_TOKEN":
         raise ValueError("Configura token en config.ini [telegram]")
     max_addr = cfg.getint("telegram", "max_addresses", fallback=100)
     data_dir = Path(cfg.get("bot", "data_dir", fallback="data/bot"))
     data_dir = data_dir if data_dir.is_absolute() else Path(__file__).resolve().parent / data_dir
-    return token, max_addr, data_dir
+    workers = max(1, cfg.getint("bot", "workers", fallback=1))
+    return token, max_addr, data_dir, workers
 
 
-def run_fetch_sync(term: str, count: int, data_dir: Path, seen_path: Path, output_path: Path) -> Path | None:
-    """Ejecuta fetch en hilo síncrono. Devuelve path del TXT generado o None si falla."""
+async def run_fetch(
+    term: str, count: int, data_dir: Path, seen_path: Path, output_path: Path, pages: SunbizPages
+) -> Path | None:
+    """Ejecuta fetch con la sesión compartida del worker. Devuelve path del TXT generado o None si falla."""
     data_dir.mkdir(parents=True, exist_ok=True)
     try:
-        results = fetch_sunbiz_data(
+        results = await fetch_sunbiz_data_async(
             search_term=term,
             max_results=count,
             output_path=str(output_path),
             seen_path=str(seen_path),
             headless=True,
+            pages=pages,
         )
         if not results:
             return None
         term_clean = term.lower().replace(" ", "")
         txt_path = data_dir / f"{term_clean}{len(results)}.txt"
-        return txt_path if txt_path.exists() else None
+        return txt_path if await aiofiles.os.path.exists(txt_path) else None
     except Exception:
         return None
 
 
-async def queue_worker(app: Application, max_addresses: int, data_dir: Path) -> None:
-    global queue_size
+async def queue_worker(app: Application, max_addresses: int, data_dir: Path, workers: int = 1) -> None:
+    """Atiende la cola con hasta `workers` peticiones a la vez, compartiendo una sola sesión."""
+    # Conexiones HTTP y, si hace falta, Camoufox para todas las peticiones; se cierra al cancelar
+    async with SunbizPages(headless=True) as pages:
+        await asyncio.gather(*(process_requests(app, max_addresses, data_dir, pages) for _ in range(workers)))
+
+
+async def process_requests(app: Application, max_addresses: int, data_dir: Path, pages: SunbizPages) -> None:
     bot = app.bot
     while True:
         try:
             chat_id, keyword, count = await request_queue.get()
-            async with queue_lock:
-                queue_size = max(0, queue_size - 1)
             count = min(count, max_addresses)
             await bot.send_message(
                 chat_id=chat_id,
                 text=f"Procesando: <b>{keyword}</b> — hasta {count} direcciones. Un momento…",
                 parse_mode="HTML",
             )
-            output_path = data_dir / "sunbiz_data.json"
             term_clean = keyword.lower().replace(" ", "")
+            output_path = data_dir / f"{term_clean}_data.json"
             seen_path = data_dir / f"{term_clean}_seen.txt"
-            loop = asyncio.get_event_loop()
-            txt_path = await loop.run_in_executor(
-                None,
-                lambda: run_fetch_sync(keyword, count, data_dir, seen_path, output_path),
-            )
-            if txt_path is None or not txt_path.exists():
-                await bot.send_message(
-                    chat_id=chat_id,
-                    text="No se encontraron direcciones nuevas o hubo un error. Prueba otra palabra o más adelante.",
-                )
-                continue
-            with open(txt_path, "rb") as f:
+            async with term_locks.setdefault(term_clean, asyncio.Lock()):
+                txt_path = await run_fetch(keyword, count, data_dir, seen_path, output_path, pages)
+                if txt_path is None or not await aiofiles.os.path.exists(txt_path):
+                    await bot.send_message(
+                        chat_id=chat_id,
+                        text="No se encontraron direcciones nuevas o hubo un error. Prueba otra palabra o más adelante.",
+                    )
+                    continue
+                async with aiofiles.open(txt_path, "rb") as f:
+                    content = await f.read()
                 await bot.send_document(
                     chat_id=chat_id,
-                    document=f,
+                    document=content,
                     filename=txt_path.name,
-                    caption=f"Sunbiz — {keyword} ({txt_path.stat().st_size} bytes)",
+                    caption=f"Sunbiz — {keyword} ({len(content)} bytes)",
                 )
-            txt_path.unlink(missing_ok=True)
+                with contextlib.suppress(FileNotFoundError):
+                    await aiofiles.os.remove(txt_path)
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -101,7 +135,6 @@ async def queue_worker(app: Application, max_addresses: int, data_dir: Path) ->
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    global queue_size
     if not update.message or not update.message.text:
         return
     text = update.message.text.strip()
@@ -117,9 +150,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     max_addresses = context.bot_data.get("max_addresses", 100)
     count = min(max(1, count), max_addresses)
     await request_queue.put((update.effective_chat.id, keyword, count))
-    async with queue_lock:
-        queue_size += 1
-    pos = queue_size
+    pos = request_queue.qsize()  # Aproximada: basta para informar al usuario
     await update.message.reply_text(
         f"En cola (posición {pos}). <b>{keyword}</b>, hasta <b>{count}</b> direcciones. "
         "Te enviaré el .txt cuando esté listo.",
@@ -140,22 +171,25 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     max_addr = context.bot_data.get("max_addresses", 100)
+    workers = context.bot_data.get("workers", 1)
+    at_once = "una a una" if workers == 1 else f"hasta {workers} a la vez"
     await update.message.reply_text(
         f"Envía un mensaje: <b>palabra cantidad</b>.\n"
         f"Límite por petición: <b>{max_addr}</b> direcciones.\n"
-        "Las peticiones se procesan en cola, una a una.",
+        f"Las peticiones se procesan en cola, {at_once}.",
         parse_mode="HTML",
     )
 
 
 def main() -> None:
-    token, max_addresses, data_dir = get_config()
+    token, max_addresses, data_dir, workers = get_config()
     data_dir.mkdir(parents=True, exist_ok=True)
 
     async def post_init(app: Application) -> None:
         app.bot_data["max_addresses"] = max_addresses
         app.bot_data["data_dir"] = data_dir
-        asyncio.create_task(queue_worker(app, max_addresses, data_dir))
+        app.bot_data["workers"] = workers
+        asyncio.create_task(queue_worker(app, max_addresses, data_dir, workers))
 
     app = (
         Application.builder()